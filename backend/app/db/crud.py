@@ -1,7 +1,9 @@
+from datetime import datetime
+from sqlalchemy import and_, delete, or_, tuple_
 from sqlalchemy.future import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.models import Room
-from typing import Optional, List
+from typing import Optional, List, Tuple
 
 async def get_room(session: AsyncSession, room_id: str) -> Optional[Room]:
     q = await session.execute(select(Room).where(Room.id == room_id))
@@ -46,3 +48,40 @@ async def delete_room(session: AsyncSession, room_id: str) -> bool:
     await session.delete(r)
     await session.commit()
     return True
+
+async def list_expired_rooms(
+    session: AsyncSession,
+    stale_before: datetime,
+    empty_before: datetime,
+    limit: int = 500,
+    after: Optional[Tuple[datetime, str]] = None,
+) -> List[Tuple[datetime, str]]:
+    """
+    Oldest-first (last_updated_at, id) of rooms untouched since `stale_before`, or empty
+    and untouched since `empty_before`. Pass the last row of a batch as `after` to page on.
+    """
+    q = select(Room.last_updated_at, Room.id).where(_expired_clause(stale_before, empty_before))
+    if after is not None:
+        q = q.where(tuple_(Room.last_updated_at, Room.id) > tuple_(*after))
+    q = q.order_by(Room.last_updated_at, Room.id).limit(limit)
+    res = await session.execute(q)
+    return [(row.last_updated_at, row.id) for row in res.all()]
+
+async def delete_expired_rooms(session: AsyncSession, room_ids: List[str], stale_before: datetime, empty_before: datetime) -> int:
+    """Delete the given rooms, re-checking expiry so rows touched since selection survive."""
+    if not room_ids:
+        return 0
+    res = await session.execute(
+        delete(Room)
+        .where(Room.id.in_(room_ids))
+        .where(_expired_clause(stale_before, empty_before))
+        .execution_options(synchronize_session=False)
+    )
+    await session.commit()
+    return res.rowcount or 0
+
+def _expired_clause(stale_before: datetime, empty_before: datetime):
+    return or_(
+        Room.last_updated_at < stale_before,
+        and_(Room.code == "", Room.last_updated_at < empty_before),
+    )
@@ -8,4 +8,4 @@ class Room(Base):
     id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
     code = Column(Text, default="", nullable=False)
     language = Column(String(32), default="python", nullable=False)
-    last_updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    last_updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), index=True)
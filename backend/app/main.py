@@ -1,10 +1,12 @@
 import json
+from typing import Optional
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 
 from config import settings
 from app.routers import rooms, autocomplete  # keep your REST routers
-from app.services.ws_manager import WSManager
+from app.services.ws_manager import MuxConnection, WSManager
+from app.services.room_gc import RoomGarbageCollector
 
 app = FastAPI()
 
@@ -20,11 +22,36 @@ app.include_router(rooms.router)
 app.include_router(autocomplete.router)
 
 ws_manager = WSManager()
+room_gc = RoomGarbageCollector(ws_manager)
+
+
+@app.on_event("startup")
+async def start_room_gc():
+    if settings.ROOM_GC_ENABLED:
+        room_gc.start()
+
+
+@app.on_event("shutdown")
+async def stop_room_gc():
+    await room_gc.stop()
+
+
+@app.on_event("shutdown")
+async def stop_save_scheduler():
+    await ws_manager.save_scheduler.stop()
+
+
+@app.get("/metrics/saves")
+async def save_metrics():
+    return ws_manager.save_scheduler.metrics()
 
 
 @app.websocket("/ws/{room_id}")
-async def websocket_endpoint(websocket: WebSocket, room_id: str):
+async def websocket_endpoint(websocket: WebSocket, room_id: str, mode: Optional[str] = None):
     """
+    Connect with `?mode=spectator` for a read-only viewer: it only receives
+    "state" messages at a capped frame rate and sees no presence/cursor traffic.
+
     WS message contract:
     - client -> server:
         {"type":"join","clientId":"...","name":"..."}
@@ -36,6 +63,10 @@ async def websocket_endpoint(websocket: WebSocket, room_id: str):
         {"type":"presence_list","participants":[{"clientId":"...","name":"..."}, ...]}
         {"type":"cursor","clientId":"...","cursor":{...}}
     """
+    if mode == "spectator":
+        await _spectator_session(room_id, websocket)
+        return
+
     await ws_manager.connect(room_id, websocket)
     client_id = None
     client_name = None
@@ -105,3 +136,66 @@ async def websocket_endpoint(websocket: WebSocket, room_id: str):
         if client_id:
             await ws_manager._broadcast(room_id, {"type": "presence", "action": "leave", "clientId": client_id, "name": client_name})
         await ws_manager.disconnect(room_id, websocket, client_id, persist_on_disconnect=True)
+
+
+async def _spectator_session(room_id: str, websocket: WebSocket):
+    await ws_manager.connect(room_id, websocket, spectator=True)
+    try:
+        while True:
+            # spectators are read-only: drain and ignore anything they send
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        await ws_manager.disconnect(room_id, websocket, spectator=True)
+    except Exception:
+        await ws_manager.disconnect(room_id, websocket, spectator=True)
+
+
+@app.websocket("/ws-mux")
+async def multiplexed_websocket_endpoint(websocket: WebSocket):
+    """
+    Read-only multiplexed endpoint: one connection watches many rooms.
+
+    WS message contract:
+    - client -> server:
+        {"type":"subscribe","roomId":"...","mode":"full"|"summary"}
+        {"type":"unsubscribe","roomId":"..."}
+    - server -> client (every message carries its roomId; updates are frame-rate capped):
+        {"type":"state","roomId":"...","code":"...","meta":{...}}
+        {"type":"summary","roomId":"...","size":123,"lastUpdatedBy":"...","language":"..."}
+        {"type":"unsubscribed","roomId":"..."}
+        {"type":"error","roomId":"...","detail":"Room not found"|"Subscription limit reached"}
+    """
+    await websocket.accept()
+    conn = MuxConnection(websocket)
+
+    try:
+        while True:
+            text = await websocket.receive_text()
+            try:
+                msg = json.loads(text)
+            except Exception:
+                # malformed message - ignore
+                continue
+
+            typ = msg.get("type")
+            room_id = msg.get("roomId")
+            if not room_id:
+                continue
+
+            if typ == "subscribe":
+                await ws_manager.subscribe(room_id, conn, msg.get("mode") or "full")
+
+            elif typ == "unsubscribe":
+                ws_manager.unsubscribe(room_id, conn)
+                conn.offer(room_id, json.dumps({"type": "unsubscribed", "roomId": room_id}))
+
+            else:
+                # ignore unknown message types
+                pass
+
+    except WebSocketDisconnect:
+        ws_manager.unsubscribe_all(conn)
+        conn.close()
+    except Exception:
+        ws_manager.unsubscribe_all(conn)
+        conn.close()
@@ -0,0 +1,103 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from app.db import crud
+from app.db.base import AsyncSessionLocal
+from app.services.ws_manager import WSManager
+from config import settings
+
+ROOM_GC_INTERVAL_SECONDS = float(getattr(settings, "ROOM_GC_INTERVAL_SECONDS", 3600.0))
+ROOM_RETENTION_TTL_SECONDS = float(getattr(settings, "ROOM_RETENTION_TTL_SECONDS", 30 * 24 * 3600.0))
+ROOM_EMPTY_TTL_SECONDS = float(getattr(settings, "ROOM_EMPTY_TTL_SECONDS", 24 * 3600.0))
+ROOM_GC_BATCH_SIZE = int(getattr(settings, "ROOM_GC_BATCH_SIZE", 500))
+ROOM_GC_BATCH_PAUSE_SECONDS = float(getattr(settings, "ROOM_GC_BATCH_PAUSE_SECONDS", 0.5))
+
+
+class RoomGarbageCollector:
+    """
+    Periodically deletes rooms that are empty or haven't been touched within the TTL.
+
+    Deletes happen in bounded batches (oldest first, via the last_updated_at index)
+    with a pause between batches so the rooms table is never locked for long.
+    Rooms currently live in the WSManager are always skipped.
+    """
+
+    def __init__(
+        self,
+        ws_manager: WSManager,
+        interval_seconds: float = ROOM_GC_INTERVAL_SECONDS,
+        retention_ttl_seconds: float = ROOM_RETENTION_TTL_SECONDS,
+        empty_ttl_seconds: float = ROOM_EMPTY_TTL_SECONDS,
+        batch_size: int = ROOM_GC_BATCH_SIZE,
+        batch_pause_seconds: float = ROOM_GC_BATCH_PAUSE_SECONDS,
+    ):
+        self.ws_manager = ws_manager
+        self.interval_seconds = interval_seconds
+        self.retention_ttl_seconds = retention_ttl_seconds
+        self.empty_ttl_seconds = empty_ttl_seconds
+        self.batch_size = max(1, batch_size)
+        self.batch_pause_seconds = batch_pause_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    # -----------------------
+    # Lifecycle
+    # -----------------------
+    def start(self):
+        if self._task and not self._task.done():
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                deleted = await self.collect_once()
+                if deleted:
+                    print(f"[RoomGC] deleted {deleted} expired rooms")
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                # replace with proper logging in production
+                print(f"[RoomGC] collection failed: {exc}")
+            await asyncio.sleep(self.interval_seconds)
+
+    # -----------------------
+    # Collection
+    # -----------------------
+    async def collect_once(self) -> int:
+        """Run one full sweep, batch by batch, and return the number of deleted rooms."""
+        now = datetime.now(timezone.utc)
+        stale_before = now - timedelta(seconds=self.retention_ttl_seconds)
+        empty_before = now - timedelta(seconds=self.empty_ttl_seconds)
+        total = 0
+        # keyset cursor: live rooms are skipped in Python, so page past them rather than
+        # excluding them in SQL (one bind parameter per live room doesn't scale)
+        after = None
+
+        while True:
+            async with AsyncSessionLocal() as session:
+                rows = await crud.list_expired_rooms(
+                    session,
+                    stale_before,
+                    empty_before,
+                    limit=self.batch_size,
+                    after=after,
+                )
+                # Skip rooms with live connections
+                room_ids = [rid for _, rid in rows if rid not in self.ws_manager.rooms]
+                deleted = await crud.delete_expired_rooms(session, room_ids, stale_before, empty_before)
+            total += deleted
+
+            if len(rows) < self.batch_size:
+                return total
+            after = rows[-1]
+            await asyncio.sleep(self.batch_pause_seconds)
@@ -0,0 +1,174 @@
+import asyncio
+import heapq
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+
+class SaveScheduler:
+    """
+    One debounced-save scheduler per process.
+
+    Keeps a heap of per-room deadlines drained by a single task instead of one
+    asyncio.Task per room per keystroke. Rescheduling a room only moves its
+    deadline in `_deadlines`; the heap keeps at most one entry per room and a
+    stale entry is pushed back with the current deadline when it surfaces.
+    Concurrent DB writes are capped by a semaphore.
+    """
+
+    def __init__(
+        self,
+        save_callback: Callable[[str], Awaitable[Any]],
+        debounce_seconds: float,
+        max_concurrent_writes: int = 8,
+    ):
+        self._save_callback = save_callback
+        self.debounce_seconds = debounce_seconds
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrent_writes))
+        self._heap: List[Tuple[float, str]] = []
+        self._in_heap: Set[str] = set()
+        self._deadlines: Dict[str, float] = {}
+        self._in_flight: Dict[str, "asyncio.Future[Any]"] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        # save-lag metrics: lag = time a save starts writing - its deadline
+        self._saves_completed = 0
+        self._saves_failed = 0
+        self._last_lag = 0.0
+        self._max_lag = 0.0
+        self._total_lag = 0.0
+
+    # -----------------------
+    # Scheduling
+    # -----------------------
+    def schedule(self, room_id: str):
+        """(Re)arm the debounced save for a room; called on every edit."""
+        loop = asyncio.get_running_loop()
+        self._ensure_task(loop)
+        self._push(room_id, loop.time() + self.debounce_seconds)
+
+    def cancel(self, room_id: str):
+        # the heap entry (if any) is dropped lazily when it reaches the top
+        self._deadlines.pop(room_id, None)
+
+    async def flush(self, room_id: str, save: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run an immediate write for a room (e.g. the final save on disconnect).
+
+        Supersedes any pending deadline and waits for an in-flight write of the same
+        room first, so an older snapshot can't land after this one. Runs under the write cap.
+        """
+        self.cancel(room_id)
+        while room_id in self._in_flight:
+            await asyncio.wait({self._in_flight[room_id]})
+        done = asyncio.get_running_loop().create_future()
+        self._in_flight[room_id] = done
+        try:
+            async with self._semaphore:
+                return await save()
+        finally:
+            self._in_flight.pop(room_id, None)
+            done.set_result(None)
+
+    def _push(self, room_id: str, deadline: float):
+        self._deadlines[room_id] = deadline
+        if room_id in self._in_heap:
+            return
+        heapq.heappush(self._heap, (deadline, room_id))
+        self._in_heap.add(room_id)
+        if self._heap[0][1] == room_id:
+            self._wakeup.set()
+
+    # -----------------------
+    # Lifecycle
+    # -----------------------
+    def _ensure_task(self, loop: asyncio.AbstractEventLoop):
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._drain())
+
+    async def stop(self):
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    async def _drain(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            if not self._heap:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            deadline, room_id = self._heap[0]
+            now = loop.time()
+            if deadline > now:
+                self._wakeup.clear()
+                handle = loop.call_at(deadline, self._wakeup.set)
+                try:
+                    await self._wakeup.wait()
+                finally:
+                    handle.cancel()
+                continue
+
+            heapq.heappop(self._heap)
+            self._in_heap.discard(room_id)
+            current = self._deadlines.get(room_id)
+            if current is None:
+                # cancelled
+                continue
+            if current > deadline:
+                # deadline moved while queued: requeue at the new time
+                self._push(room_id, current)
+                continue
+            if room_id in self._in_flight:
+                # don't race an older write for the same room; try again after it lands
+                self._push(room_id, now + self.debounce_seconds)
+                continue
+
+            del self._deadlines[room_id]
+            await self._semaphore.acquire()
+            if room_id in self._in_flight:
+                # a flush started while we waited for a write slot; it supersedes this save
+                self._semaphore.release()
+                continue
+            self._in_flight[room_id] = loop.create_task(self._save(room_id, deadline))
+
+    async def _save(self, room_id: str, deadline: float):
+        lag = asyncio.get_running_loop().time() - deadline
+        try:
+            # callback returns True when written, False on failure, None when there was nothing to write
+            ok = await self._save_callback(room_id)
+            if ok is False:
+                self._saves_failed += 1
+            elif ok:
+                self._saves_completed += 1
+                self._record_lag(lag)
+        except Exception as exc:
+            self._saves_failed += 1
+            print(f"[SaveScheduler] save failed for room {room_id}: {exc}")
+        finally:
+            self._in_flight.pop(room_id, None)
+            self._semaphore.release()
+
+    # -----------------------
+    # Metrics
+    # -----------------------
+    def _record_lag(self, lag: float):
+        lag = max(0.0, lag)
+        self._last_lag = lag
+        self._max_lag = max(self._max_lag, lag)
+        self._total_lag += lag
+
+    def metrics(self) -> Dict[str, Any]:
+        completed = self._saves_completed
+        return {
+            "pending": len(self._deadlines),
+            "inFlight": len(self._in_flight),
+            "savesCompleted": completed,
+            "savesFailed": self._saves_failed,
+            "lastLagSeconds": self._last_lag,
+            "maxLagSeconds": self._max_lag,
+            "avgLagSeconds": (self._total_lag / completed) if completed else 0.0,
+        }
@@ -1,15 +1,84 @@
 import asyncio
 import json
-import time
 from typing import Dict, Set, Any, Optional, List
 
 from fastapi import WebSocket
 
 from app.db import crud
 from app.db.base import AsyncSessionLocal
+from app.services.save_scheduler import SaveScheduler
 from config import settings
 
 SAVE_DEBOUNCE_SECONDS = float(getattr(settings, "SAVE_DEBOUNCE_SECONDS", 2.0))
+SAVE_MAX_CONCURRENT_WRITES = int(getattr(settings, "SAVE_MAX_CONCURRENT_WRITES", 8))
+SPECTATOR_MAX_FPS = float(getattr(settings, "SPECTATOR_MAX_FPS", 10.0))
+SPECTATOR_SEND_TIMEOUT_SECONDS = float(getattr(settings, "SPECTATOR_SEND_TIMEOUT_SECONDS", 5.0))
+SPECTATOR_FRAME_KEY = "state"
+MUX_MAX_SUBSCRIPTIONS = int(getattr(settings, "MUX_MAX_SUBSCRIPTIONS", 100))
+
+
+class FrameSink:
+    """
+    Coalescing outbox for a read-only viewer socket.
+
+    Holds at most one pending payload per key and drains it with a single writer
+    task, so a slow viewer never accumulates frames or concurrent sends; it just
+    gets the newest frame once its previous send finishes. A send that exceeds
+    SPECTATOR_SEND_TIMEOUT_SECONDS closes the socket, and the endpoint's normal
+    disconnect path removes the viewer.
+    """
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.closed = False
+        self._pending: Dict[str, str] = {}
+        self._writer: Optional[asyncio.Task] = None
+
+    def offer(self, key: str, data: str):
+        if self.closed:
+            return
+        self._pending[key] = data
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.get_running_loop().create_task(self._drain())
+
+    def discard(self, key: str):
+        self._pending.pop(key, None)
+
+    def close(self):
+        self.closed = True
+        self._pending.clear()
+        if self._writer and not self._writer.done():
+            self._writer.cancel()
+        self._writer = None
+
+    async def _drain(self):
+        while self._pending and not self.closed:
+            key = next(iter(self._pending))
+            data = self._pending.pop(key)
+            try:
+                await asyncio.wait_for(self.websocket.send_text(data), SPECTATOR_SEND_TIMEOUT_SECONDS)
+            except Exception as exc:
+                print(f"[FrameSink] dropping slow or broken viewer: {exc!r}")
+                self.closed = True
+                self._pending.clear()
+                try:
+                    await self.websocket.close()
+                except Exception:
+                    pass
+                return
+
+
+class MuxConnection(FrameSink):
+    """
+    One multiplexed WebSocket subscribed to many rooms.
+
+    Pending payloads are keyed by room id, so a slow connection holds at most
+    the newest frame per subscribed room and one writer drains them in turn.
+    """
+
+    def __init__(self, websocket: WebSocket):
+        super().__init__(websocket)
+        self.subscriptions: Dict[str, str] = {}  # room_id -> "full" | "summary"
 
 
 class RoomState:
@@ -19,30 +88,41 @@ class RoomState:
         self.lock = asyncio.Lock()
         self.meta: Dict[str, Any] = {}  # e.g. lastUpdatedBy, language
         self._dirty: bool = False
-        self._last_edit_ts: float = 0.0
-        self._save_task: Optional[asyncio.Task] = None
         self._loaded: bool = False  # Track if data has been loaded from DB
         # Track participants by WebSocket connection to handle duplicate client_ids
         # Map: WebSocket -> (client_id, name)
         self.connection_participants: Dict[WebSocket, tuple[str, str]] = {}
+        # Read-only viewers: kept out of `clients` so they never receive per-keystroke
+        # broadcasts, presence or cursor traffic; they get frame-rate capped snapshots instead
+        self.spectators: Dict[WebSocket, FrameSink] = {}
+        # Multiplexed subscribers (see MuxConnection) -> "full" | "summary"
+        self.subscribers: Dict[MuxConnection, str] = {}
+        self._version: int = 0  # bumped on every applied update
+        self._spectator_version: int = 0  # version of the last snapshot sent to spectators
+        self._last_summary: Optional[str] = None  # last encoded summary frame, for dedupe
+        self._last_frame_ts: float = 0.0
+        self._frame_task: Optional[asyncio.Task] = None
 
     def mark_dirty(self):
         self._dirty = True
-        self._last_edit_ts = time.time()
 
     def clear_dirty(self):
         self._dirty = False
-        self._last_edit_ts = 0.0
 
-    def cancel_save_task(self):
-        if self._save_task and not self._save_task.done():
-            self._save_task.cancel()
-            self._save_task = None
+    def has_watchers(self) -> bool:
+        return bool(self.spectators or self.subscribers)
+
+    def cancel_frame_task(self):
+        if self._frame_task and not self._frame_task.done():
+            self._frame_task.cancel()
+        self._frame_task = None
 
 
 class WSManager:
     def __init__(self):
         self.rooms: Dict[str, RoomState] = {}
+        # one process-wide scheduler for debounced saves (replaces a task per room per edit)
+        self.save_scheduler = SaveScheduler(self._save_due_room, SAVE_DEBOUNCE_SECONDS, SAVE_MAX_CONCURRENT_WRITES)
 
     def _ensure(self, room_id: str) -> RoomState:
         if room_id not in self.rooms:
@@ -70,31 +150,61 @@ class WSManager:
     # -----------------------
     # Connection lifecycle
     # -----------------------
-    async def connect(self, room_id: str, websocket: WebSocket):
+    async def connect(self, room_id: str, websocket: WebSocket, spectator: bool = False):
         room = self._ensure(room_id)
         await websocket.accept()
+        if spectator:
+            # registered before the DB load so the room stays alive; frames and the initial
+            # state share the sink's single writer, so they can't overlap on the socket
+            sink = FrameSink(websocket)
+            room.spectators[websocket] = sink
+            # no per-join debug dumps here: a lecture can bring 1,000+ spectators in at once
+            await self._load_room(room_id, room, verbose=False)
+            # spectators don't get presence traffic
+            sink.offer(SPECTATOR_FRAME_KEY, json.dumps({"type": "state", "code": room.code, "meta": room.meta}))
+            return
+
         room.clients.add(websocket)
         
         print(f"🔴 [Backend] Client connected to room {room_id}")
-        print(f"🔴 [Backend] Total clients now: {len(room.clients)}")
+        print(f"🔴 [Backend] Total clients now: {len(room.clients)} (+{len(room.spectators)} spectators)")
         print(f"🔴 [Backend] Current room.code: {repr(room.code)}")
         print(f"🔴 [Backend] Current room.meta: {room.meta}")
         print(f"🔴 [Backend] Room already loaded: {room._loaded}")
         
+        await self._load_room(room_id, room)
+        
+        # send initial state to the connecting client
+        print(f"🔴 [Backend] Sending initial state: code={repr(room.code)}, meta={room.meta}")
+        try:
+            await websocket.send_text(json.dumps({"type": "state", "code": room.code, "meta": room.meta}))
+            # also send the current participants list so the joining client sees everyone
+            participants = self.get_participants_list(room_id)
+            await websocket.send_text(json.dumps({"type": "presence_list", "participants": participants}))
+            print(f"🔴 [Backend] Initial state sent successfully")
+        except Exception as e:
+            # Best-effort; don't fail connect if send fails
+            print(f"🔴 [Backend] Failed to send initial state: {e}")
+            pass
+
+    async def _load_room(self, room_id: str, room: RoomState, verbose: bool = True):
         # Load persisted room data from database if not yet loaded
         # Use _loaded flag instead of checking client count to handle multiple simultaneous connections
         if not room._loaded:
-            print(f"🔴 [Backend] Loading from DB (first time)...")
+            if verbose:
+                print(f"🔴 [Backend] Loading from DB (first time)...")
             try:
                 async with AsyncSessionLocal() as session:
                     existing = await crud.get_room(session, room_id)
                     if existing:
-                        print(f"🔴 [Backend] Found in DB - code: {repr(existing.code)}, language: {existing.language}")
+                        if verbose:
+                            print(f"🔴 [Backend] Found in DB - code: {repr(existing.code)}, language: {existing.language}")
                         # Load persisted code and language
                         room.code = existing.code or ""
                         room.meta["language"] = existing.language or "python"
                     else:
-                        print(f"🔴 [Backend] Room not found in DB, starting fresh")
+                        if verbose:
+                            print(f"🔴 [Backend] Room not found in DB, starting fresh")
                     # Mark as loaded regardless of whether we found it in DB
                     room._loaded = True
             except Exception as exc:
@@ -102,37 +212,101 @@ class WSManager:
                 print(f"[WSManager.connect] failed to load room {room_id}: {exc}")
                 # Still mark as loaded to prevent retry loops
                 room._loaded = True
-        else:
+        elif verbose:
             print(f"🔴 [Backend] Skipping DB load - already loaded")
-        
-        # send initial state to the connecting client
-        print(f"🔴 [Backend] Sending initial state: code={repr(room.code)}, meta={room.meta}")
-        try:
-            await websocket.send_text(json.dumps({"type": "state", "code": room.code, "meta": room.meta}))
-            # also send the current participants list so the joining client sees everyone
-            participants = self.get_participants_list(room_id)
-            await websocket.send_text(json.dumps({"type": "presence_list", "participants": participants}))
-            print(f"🔴 [Backend] Initial state sent successfully")
-        except Exception as e:
-            # Best-effort; don't fail connect if send fails
-            print(f"🔴 [Backend] Failed to send initial state: {e}")
-            pass
 
-    async def disconnect(self, room_id: str, websocket: WebSocket, client_id: Optional[str] = None, persist_on_disconnect: bool = True):
+    async def disconnect(self, room_id: str, websocket: WebSocket, client_id: Optional[str] = None, persist_on_disconnect: bool = True, spectator: bool = False):
         room = self._ensure(room_id)
-        room.clients.discard(websocket)
-        # Remove participant by websocket connection
-        self.remove_participant(room_id, websocket)
+        if spectator:
+            sink = room.spectators.pop(websocket, None)
+            if sink is not None:
+                sink.close()
+        else:
+            room.clients.discard(websocket)
+            # Remove participant by websocket connection
+            self.remove_participant(room_id, websocket)
 
-        # If no clients left -> try to persist and cleanup
-        if not room.clients:
-            room.cancel_save_task()
+        # If the last editor left -> try to persist (spectators never edit, so they don't trigger a save)
+        if not room.clients and not spectator:
             if persist_on_disconnect:
-                # attempt one last persist (await it to increase chance of success)
-                await self._persist_room_now(room_id, room.code, room.meta.get("language"), room.meta.get("lastUpdatedBy"))
-            # remove room from memory
+                # attempt one last persist (await it to increase chance of success); goes through the
+                # scheduler so it supersedes the pending save and lands after any in-flight one
+                await self.save_scheduler.flush(room_id, lambda: self._persist_final_state(room_id, room))
+            else:
+                self.save_scheduler.cancel(room_id)
+
+        self._release_if_idle(room_id, room)
+
+    def _release_if_idle(self, room_id: str, room: RoomState):
+        # Keep the room in memory while anyone (editor, spectator or subscriber) is still connected
+        if not room.clients and not room.has_watchers():
+            room.cancel_frame_task()
             self.rooms.pop(room_id, None)
 
+    # -----------------------
+    # Multiplexed subscriptions
+    # -----------------------
+    async def subscribe(self, room_id: str, conn: MuxConnection, mode: str = "full") -> bool:
+        mode = "summary" if mode == "summary" else "full"
+        if room_id not in conn.subscriptions and len(conn.subscriptions) >= MUX_MAX_SUBSCRIPTIONS:
+            conn.offer(room_id, json.dumps({"type": "error", "roomId": room_id, "detail": "Subscription limit reached"}))
+            return False
+
+        room = self.rooms.get(room_id)
+        if room is None:
+            # Only live or persisted rooms can be watched: don't materialise (and keep alive) arbitrary ids
+            existing = None
+            try:
+                async with AsyncSessionLocal() as session:
+                    existing = await crud.get_room(session, room_id)
+            except Exception as exc:
+                print(f"[WSManager.subscribe] failed to load room {room_id}: {exc}")
+            if existing is None:
+                conn.offer(room_id, json.dumps({"type": "error", "roomId": room_id, "detail": "Room not found"}))
+                return False
+            # the room may have gone live while we were reading
+            room = self.rooms.get(room_id)
+            if room is None:
+                room = self._ensure(room_id)
+                room.code = existing.code or ""
+                room.meta["language"] = existing.language or "python"
+                room._loaded = True
+
+        room.subscribers[conn] = mode
+        conn.subscriptions[room_id] = mode
+        await self._load_room(room_id, room)
+        # the initial snapshot doubles as the subscribe ack
+        message = self._summary_message(room_id, room) if mode == "summary" else self._tagged_state_message(room_id, room)
+        conn.offer(room_id, json.dumps(message))
+        return True
+
+    def unsubscribe(self, room_id: str, conn: MuxConnection):
+        conn.subscriptions.pop(room_id, None)
+        conn.discard(room_id)
+        room = self.rooms.get(room_id)
+        if room is None:
+            return
+        room.subscribers.pop(conn, None)
+        self._release_if_idle(room_id, room)
+
+    def unsubscribe_all(self, conn: MuxConnection):
+        for room_id in list(conn.subscriptions):
+            self.unsubscribe(room_id, conn)
+
+    @staticmethod
+    def _tagged_state_message(room_id: str, room: RoomState) -> dict:
+        return {"type": "state", "roomId": room_id, "code": room.code, "meta": room.meta}
+
+    @staticmethod
+    def _summary_message(room_id: str, room: RoomState) -> dict:
+        return {
+            "type": "summary",
+            "roomId": room_id,
+            "size": len(room.code),
+            "lastUpdatedBy": room.meta.get("lastUpdatedBy"),
+            "language": room.meta.get("language"),
+        }
+
     # -----------------------
     # Apply updates & persistence
     # -----------------------
@@ -145,28 +319,40 @@ class WSManager:
             if language:
                 room.meta["language"] = language
             room.mark_dirty()
+            room._version += 1
 
-            # debounce persistence: cancel previously scheduled save and schedule a new one
-            room.cancel_save_task()
-            loop = asyncio.get_running_loop()
-            room._save_task = loop.create_task(self._debounced_save(room_id, SAVE_DEBOUNCE_SECONDS))
+            # debounce persistence: push this room's save deadline out on the shared scheduler
+            self.save_scheduler.schedule(room_id)
 
         # broadcast the new state to ALL clients (including originator; client will decide to ignore if needed)
         await self._broadcast(room_id, {"type": "state", "code": room.code, "meta": room.meta})
+        self._schedule_spectator_frame(room_id, room)
 
-    async def _debounced_save(self, room_id: str, debounce_seconds: float):
-        room = self._ensure(room_id)
-        try:
-            await asyncio.sleep(debounce_seconds)
-            now = time.time()
-            if (now - room._last_edit_ts) >= debounce_seconds and room._dirty:
-                # run DB persistence in background to avoid blocking
-                asyncio.create_task(self._persist_room_now(room_id, room.code, room.meta.get("language"), room.meta.get("lastUpdatedBy")))
+    async def _save_due_room(self, room_id: str) -> Optional[bool]:
+        # called by the save scheduler once the room's debounce deadline has passed
+        room = self.rooms.get(room_id)
+        if room is None or not room._dirty:
+            return None
+        version = room._version
+        ok = await self._persist_room_now(room_id, room.code, room.meta.get("language"), room.meta.get("lastUpdatedBy"))
+        if ok:
+            # edits made while the write was in flight keep the room dirty (and already rescheduled it)
+            if room._version == version:
                 room.clear_dirty()
-        except asyncio.CancelledError:
-            return
+        elif self.rooms.get(room_id) is room:
+            # still dirty: retry after another debounce instead of waiting for the next keystroke
+            self.save_scheduler.schedule(room_id)
+        return ok
+
+    async def _persist_final_state(self, room_id: str, room: RoomState) -> bool:
+        # snapshot when the write slot is ours, not when disconnect started
+        version = room._version
+        ok = await self._persist_room_now(room_id, room.code, room.meta.get("language"), room.meta.get("lastUpdatedBy"))
+        if ok and room._version == version:
+            room.clear_dirty()
+        return ok
 
-    async def _persist_room_now(self, room_id: str, code: str, language: Optional[str] = "python", last_updated_by: Optional[str] = None):
+    async def _persist_room_now(self, room_id: str, code: str, language: Optional[str] = "python", last_updated_by: Optional[str] = None) -> bool:
         try:
             async with AsyncSessionLocal() as session:
                 existing = await crud.get_room(session, room_id)
@@ -180,9 +366,11 @@ class WSManager:
                     # If your crud.create_room signature differs, adapt accordingly.
                     await crud.create_room(session, room_id=room_id, language=language or "python")
                     await crud.update_room_code(session, room_id, code)
+            return True
         except Exception as exc:
             # replace with proper logging in production
             print(f"[WSManager.persist] failed to persist room {room_id}: {exc}")
+            return False
 
     # -----------------------
     # Broadcast helpers
@@ -204,3 +392,61 @@ class WSManager:
                 to_remove.add(ws)
         for ws in to_remove:
             room.clients.discard(ws)
+
+    # -----------------------
+    # Spectator / subscriber fan-out
+    # -----------------------
+    def _schedule_spectator_frame(self, room_id: str, room: RoomState):
+        # at most one pending frame per room; updates landing before it fires are coalesced
+        if not room.has_watchers() or (room._frame_task and not room._frame_task.done()):
+            return
+        loop = asyncio.get_running_loop()
+        frame_interval = 1.0 / SPECTATOR_MAX_FPS if SPECTATOR_MAX_FPS > 0 else 0.0
+        delay = max(0.0, room._last_frame_ts + frame_interval - loop.time())
+        room._frame_task = loop.create_task(self._flush_spectator_frame(room_id, room, delay))
+
+    async def _flush_spectator_frame(self, room_id: str, room: RoomState, delay: float):
+        try:
+            if delay:
+                await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            return
+        try:
+            await self._send_frame(room_id, room)
+        finally:
+            # the frame slot stays taken until this frame is out; catch up on edits made meanwhile
+            if room._frame_task is asyncio.current_task():
+                room._frame_task = None
+                if room._version != room._spectator_version and self.rooms.get(room_id) is room:
+                    self._schedule_spectator_frame(room_id, room)
+
+    async def _send_frame(self, room_id: str, room: RoomState):
+        room._last_frame_ts = asyncio.get_running_loop().time()
+        if room._version == room._spectator_version:
+            # nothing changed since the last frame
+            return
+        room._spectator_version = room._version
+        # encode once per frame and per message shape, shared by every spectator/subscriber
+        if room.spectators:
+            data = json.dumps({"type": "state", "code": room.code, "meta": room.meta})
+            for ws, sink in list(room.spectators.items()):
+                if sink.closed:
+                    room.spectators.pop(ws, None)
+                else:
+                    sink.offer(SPECTATOR_FRAME_KEY, data)
+        if room.subscribers:
+            encoded: Dict[str, Optional[str]] = {}
+            for conn, mode in list(room.subscribers.items()):
+                if conn.closed:
+                    room.subscribers.pop(conn, None)
+                    continue
+                if mode not in encoded:
+                    if mode == "summary":
+                        data = json.dumps(self._summary_message(room_id, room))
+                        # summaries only change with size/editor/language, skip identical ones
+                        encoded[mode] = None if data == room._last_summary else data
+                        room._last_summary = data
+                    else:
+                        encoded[mode] = json.dumps(self._tagged_state_message(room_id, room))
+                if encoded[mode] is not None:
+                    conn.offer(room_id, encoded[mode])
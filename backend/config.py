@@ -8,6 +8,17 @@ class Settings(BaseSettings):
     ALLOWED_ORIGINS: str = ""
     DEBUG: bool = False
     SAVE_DEBOUNCE_SECONDS: float = 2.0
+    SAVE_MAX_CONCURRENT_WRITES: int = 8
+    SPECTATOR_MAX_FPS: float = 10.0
+    SPECTATOR_SEND_TIMEOUT_SECONDS: float = 5.0
+    MUX_MAX_SUBSCRIPTIONS: int = 100
+    # Room garbage collection (rooms that are empty or untouched for too long)
+    ROOM_GC_ENABLED: bool = True
+    ROOM_GC_INTERVAL_SECONDS: float = 3600.0
+    ROOM_RETENTION_TTL_SECONDS: float = 30 * 24 * 3600.0
+    ROOM_EMPTY_TTL_SECONDS: float = 24 * 3600.0
+    ROOM_GC_BATCH_SIZE: int = 500
+    ROOM_GC_BATCH_PAUSE_SECONDS: float = 0.5
     HOST: str = "127.0.0.1"
     PORT: int = 8000
 
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# run from backend/ like the app itself: make `app` and `config` importable
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# Settings requires a DATABASE_URL; tests bind their own engines
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite://")
@@ -0,0 +1,61 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.future import select
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.db.models import Room
+from app.services import room_gc
+from app.services.room_gc import RoomGarbageCollector
+from app.services.ws_manager import WSManager
+
+DAY = 24 * 3600.0
+
+
+def test_collect_once_pages_past_live_rooms(tmp_path, monkeypatch):
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'gc.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        monkeypatch.setattr(room_gc, "AsyncSessionLocal", session_factory)
+
+        now = datetime.now(timezone.utc)
+        rooms = []
+        # 10 stale rooms, oldest first; the 4 oldest are live so the whole first batch is skipped
+        for i in range(10):
+            rooms.append(Room(id=f"stale-{i}", code="x", language="python", last_updated_at=now - timedelta(days=60 - i)))
+        # empty and past the empty TTL, but within retention
+        rooms.append(Room(id="empty-old", code="", language="python", last_updated_at=now - timedelta(days=2)))
+        # kept: recent, or non-empty within retention
+        rooms.append(Room(id="empty-fresh", code="", language="python", last_updated_at=now - timedelta(hours=1)))
+        rooms.append(Room(id="busy", code="x", language="python", last_updated_at=now - timedelta(days=2)))
+        async with session_factory() as session:
+            session.add_all(rooms)
+            await session.commit()
+
+        ws_manager = WSManager()
+        live = {f"stale-{i}" for i in range(4)}
+        for room_id in live:
+            ws_manager._ensure(room_id)
+
+        gc = RoomGarbageCollector(
+            ws_manager,
+            retention_ttl_seconds=30 * DAY,
+            empty_ttl_seconds=DAY,
+            batch_size=3,
+            batch_pause_seconds=0,
+        )
+        deleted = await gc.collect_once()
+
+        async with session_factory() as session:
+            remaining = set((await session.execute(select(Room.id))).scalars().all())
+        await engine.dispose()
+        return deleted, remaining, live
+
+    deleted, remaining, live = asyncio.run(run())
+
+    assert deleted == 7
+    assert remaining == live | {"empty-fresh", "busy"}
@@ -0,0 +1,28 @@
+import asyncio
+
+from app.services.ws_manager import WSManager
+
+
+def test_failed_debounced_save_is_retried():
+    async def run():
+        manager = WSManager()
+        manager.save_scheduler.debounce_seconds = 0.01
+        writes = []
+
+        async def persist(room_id, code, language=None, last_updated_by=None):
+            writes.append(code)
+            return len(writes) > 1  # first write fails
+
+        manager._persist_room_now = persist
+        await manager.apply_update("room", "print(1)", client_id="a")
+        await asyncio.sleep(0.1)
+        room = manager.rooms["room"]
+        await manager.save_scheduler.stop()
+        return writes, room._dirty, manager.save_scheduler.metrics()
+
+    writes, dirty, metrics = asyncio.run(run())
+
+    assert writes == ["print(1)", "print(1)"]
+    assert not dirty
+    assert metrics["savesFailed"] == 1
+    assert metrics["savesCompleted"] == 1
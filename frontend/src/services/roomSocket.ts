@@ -22,6 +22,7 @@ export interface RoomSocketOptions {
   onPresence?: PresenceHandler;
   reconnect?: boolean;
   reconnectBaseMs?: number;
+  spectator?: boolean; // read-only viewer: no join/presence, receives throttled state snapshots
 }
 
 export class RoomSocket {
@@ -37,6 +38,7 @@ export class RoomSocket {
   private onPresence?: PresenceHandler;
   private reconnect: boolean;
   private reconnectBaseMs: number;
+  private spectator: boolean;
   private reconnectAttempts = 0;
   public status: "disconnected" | "connecting" | "connected" = "disconnected";
 
@@ -60,6 +62,7 @@ export class RoomSocket {
     this.onPresence = opts?.onPresence;
     this.reconnect = opts?.reconnect ?? true;
     this.reconnectBaseMs = opts?.reconnectBaseMs ?? 1000;
+    this.spectator = opts?.spectator ?? false;
   }
 
   private generateUniqueSessionId(): string {
@@ -72,7 +75,8 @@ export class RoomSocket {
   }
 
   private wsUrl() {
-    return `${this.wsBase.replace(/\/$/, "")}/ws/${encodeURIComponent(this.roomId)}`;
+    const url = `${this.wsBase.replace(/\/$/, "")}/ws/${encodeURIComponent(this.roomId)}`;
+    return this.spectator ? `${url}?mode=spectator` : url;
   }
 
   connect() {
@@ -89,6 +93,11 @@ export class RoomSocket {
       this.reconnectAttempts = 0;
       // Generate new session ID for this connection
       this.sessionId = this.generateUniqueSessionId();
+      // spectators don't join presence
+      if (this.spectator) {
+        this.onOpen?.();
+        return;
+      }
       // send join with unique session ID (combine clientId and sessionId for uniqueness)
       const uniqueClientId = `${this.clientId}_${this.sessionId}`;
       this.sendRaw({ type: "join", clientId: uniqueClientId, name: this.name });